@@ -2,14 +2,16 @@
 # flake8: noqa  # prevents 'imported but unused' erros
 # pylint: disable=C0413,C0411
 
-# ignore IPython's ShimWarning, if IPython is installed
+# ignore IPython's ShimWarning, if IPython is already loaded; checking
+# sys.modules avoids the heavy `import IPython` for plain-script consumers
 import sys
-try:
-    import warnings
-    from IPython.utils.shimmodule import ShimWarning
-    warnings.simplefilter("ignore", ShimWarning)
-except ImportError:
-    pass
+if 'IPython' in sys.modules:
+    try:
+        import warnings
+        from IPython.utils.shimmodule import ShimWarning
+        warnings.simplefilter("ignore", ShimWarning)
+    except ImportError:
+        pass
 try:
     del ShimWarning
 except NameError:
@@ -2,17 +2,20 @@
 
 import re
 import warnings
+from collections import defaultdict
+from functools import lru_cache
 from math import inf
 
 from comath.segment import LineSegment
 
 
-__LOGICAL_OPS = set(('$or', '$and', '$not', '$nor'))
-__COMPAR_OPS = set(('$eq', '$gt', '$gte', '$lt', '$lte', '$ne', '$in', '$nin'))
+_LOGICAL_OPS = frozenset(('$or', '$and', '$not', '$nor'))
+_COMPAR_OPS = frozenset(
+    ('$eq', '$gt', '$gte', '$lt', '$lte', '$ne', '$in', '$nin'))
 
 
 def _contains_logical_op(matchop):
-    return len(matchop.keys() & __LOGICAL_OPS) > 0
+    return not _LOGICAL_OPS.isdisjoint(matchop)
 
 
 def _val_in_inter(val, intersection):
@@ -21,32 +24,55 @@ def _val_in_inter(val, intersection):
     return True
 
 
+def _handle_eq(op, val, state):
+    state['equ'].append(val)
+
+
+def _handle_gt(op, val, state):
+    state['gts'][val].add(op)
+
+
+def _handle_lt(op, val, state):
+    state['lts'][val].add(op)
+
+
+def _handle_ne(op, val, state):
+    state['nins'].add(val)
+
+
+def _handle_nin(op, val, state):
+    state['nins'].update(val)
+
+
+def _handle_in(op, val, state):
+    state['ins'].append(val)
+
+
+_OP_HANDLERS = {
+    '$eq': _handle_eq,
+    '$gt': _handle_gt,
+    '$gte': _handle_gt,
+    '$lt': _handle_lt,
+    '$lte': _handle_lt,
+    '$ne': _handle_ne,
+    '$nin': _handle_nin,
+    '$in': _handle_in,
+}
+
+
 def _build_op_kinds(compar_ops, compar_vals):
-    equ = []
-    gts = {}
-    lts = {}
-    nins = set()
-    ins = []
+    state = {
+        'equ': [],
+        'gts': defaultdict(set),
+        'lts': defaultdict(set),
+        'nins': set(),
+        'ins': [],
+    }
+    handlers = _OP_HANDLERS
     for op, val in zip(compar_ops, compar_vals):
-        if op == '$eq':
-            equ.append(val)
-        if op in ['$gt', '$gte']:
-            try:
-                gts[val].add(op)
-            except KeyError:
-                gts[val] = set([op])
-        if op in ['$lt', '$lte']:
-            try:
-                lts[val].add(op)
-            except KeyError:
-                lts[val] = set([op])
-        if op == '$ne':
-            nins.add(val)
-        if op == '$nin':
-            nins = nins.union(val)
-        if op == '$in':
-            ins.append(val)
-    return equ, gts, lts, nins, ins
+        handlers[op](op, val, state)
+    return (state['equ'], state['gts'], state['lts'], state['nins'],
+            state['ins'])
 
 
 def _resolve_compar_ops(compar_ops, compar_vals):
@@ -59,7 +85,8 @@ def _resolve_compar_ops(compar_ops, compar_vals):
     equ, gts, lts, nins, ins = _build_op_kinds(compar_ops, compar_vals)
 
     # resolving stuff with $eq in them is easy... it overrides everything.
-    if len(set(equ)) > 1:
+    equ_set = set(equ)
+    if len(equ_set) > 1:
         warnings.warn("More than one $eq for the same field in Matchops joined"
                       " by &, with different values. "
                       "Resulting Matchop matches the empty set.")
@@ -86,22 +113,20 @@ def _resolve_compar_ops(compar_ops, compar_vals):
         res[lt_op] = min_lt
     else:
         lt_op = '$lte'
-        max_gt = inf
-    segment = LineSegment(max_gt, max_gt, gt_op == '$gte', lt_op == '$lte')
+        min_lt = inf
+    segment = LineSegment(max_gt, min_lt, gt_op == '$gte', lt_op == '$lte')
     if len(nins) > 0:
         res['$nin'] = list(nins)
     ins_intersection = None
     if len(ins) > 0:
-        ins_intersection = set(ins[0])
-        for i in range(1, len(ins)):
-            ins_intersection = ins_intersection & ins[i]
+        ins_intersection = set(ins[0]).intersection(*ins[1:])
         res['$in'] = ins_intersection
     if ins_intersection:
         if len(ins_intersection.intersection(nins)) > 1:
             warnings.warn(
                 "Matchop and operation resulted in a Matchop demanding")
         ins_intersection = segment & ins_intersection
-    if len(set(equ)) == 1:
+    if len(equ_set) == 1:
         res['$eq'] = equ[0]
         if equ[0] in segment and _val_in_inter(equ[0], ins_intersection):
             return {'$eq': equ[0]}
@@ -121,7 +146,7 @@ def _optimized_and(first, second, intersection):
         for matchop in [first, second]:
             if isinstance(matchop[key], dict):
                 for subkey in matchop[key]:
-                    if subkey in __COMPAR_OPS:
+                    if subkey in _COMPAR_OPS:
                         compar_ops.append(subkey)
                         compar_vals.append(matchop[key][subkey])
                     else:
@@ -182,11 +207,12 @@ def regex_matchop(field_name, pattern_obj):
     })
 
 
+@lru_cache(maxsize=256)
+def _compiled_pattern(substring, ignore_case):
+    return re.compile(substring, re.I if ignore_case else 0)
+
+
 def substring_matchop(field_name, substring, ignore_case=True):
     """Returns a Matchop matching documents where the field with the given
     name contains the given string."""
-    if ignore_case:
-        pattern_obj = re.compile(substring, re.I)
-    else:
-        pattern_obj = re.compile(substring)
-    return regex_matchop(field_name, pattern_obj)
+    return regex_matchop(field_name, _compiled_pattern(substring, ignore_case))
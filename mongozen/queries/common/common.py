@@ -1,47 +1,84 @@
 
 import operator  # for sorting result dicts
-from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor  # for concurrent counts
 
 from prettytable import PrettyTable  # printing results in pretty ASCII tables
 
 import mongozen
 
+def _nested_field_value(doc, field_name):
+    # resolve dotted field names as paths, like mongo's $-expressions do
+    value = doc
+    for part in field_name.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
 def get_array_of_field_values_matching(field_names, matchop, collection_obj):
-    """Returns an array with all values the given field takes in all documents
-    matched by the given Matchop in the given collection."""
-    push_dict = {field_name : "$" + field_name for field_name in field_names}
-    agg_pipe = [
-        {'$match' : matchop},
-        {'$group': {
-            '_id': None,
-            'values': {
-                # '$push':  {'value': "$" + field_name}
-                '$push': push_dict
-            }
-        }}
-    ]
-    return collection_obj.aggregate(agg_pipe).next()['values']
+    """Returns a lazy iterator over the values the given fields take in all
+    documents matched by the given Matchop in the given collection.
+
+    Results are streamed from a find cursor rather than accumulated into a
+    single \\$push-built array document, so they are not capped by the 16MB
+    BSON document size limit. Dotted field names are resolved as nested
+    paths. Wrap in list() if a materialized array is needed."""
+    projection = {field_name: 1 for field_name in field_names}
+    cursor = collection_obj.find(matchop, projection)
+    return (
+        {
+            field_name: _nested_field_value(doc, field_name)
+            for field_name in field_names
+        }
+        for doc in cursor
+    )
 
 
 def count_keys_in(keys_list, collection_obj, verbose=False):
-    """Counts the keys in a mongo collection."""
+    """Counts the keys in a mongo collection.
+
+    A key is counted in every document where it is present, including
+    documents where its value is null or falsy. Keys that lead an index are
+    counted with count_documents queries on \\$exists, which the index
+    answers without scanning the collection; these counts are issued
+    concurrently to hide the round-trip latency. All remaining keys are
+    counted together in a single \\$group scan with the same presence
+    predicate, so unindexed keys still cost one collection pass in total
+    rather than one \\$exists scan each."""
     if verbose:
         print('\nCounting keys in collection %s.' % collection_obj.full_name)
     if '_id' in keys_list:
         keys_list.remove('_id')
-    group_params = {'_id': None}
-    for key in keys_list:
-        group_params[key] = {'$sum': {
-            '$cond': {
-                'if': {
-                    '$ifNull': ["$" + key, False]}, 'then': 1, 'else': 0}
-        }}
-    cursor = collection_obj.aggregate([
-        {'$group': group_params},
-    ])
-    res = cursor.next()
-    del res['_id']
-    return res
+    indexed = {
+        spec['key'][0][0]
+        for spec in collection_obj.index_information().values()
+        if spec.get('key')
+    }
+    indexed_keys = [key for key in keys_list if key in indexed]
+    scanned_keys = [key for key in keys_list if key not in indexed]
+    res = {}
+    if indexed_keys:
+        def _count(key):
+            return collection_obj.count_documents({key: {'$exists': True}})
+
+        with ThreadPoolExecutor() as executor:
+            res.update(zip(indexed_keys, executor.map(_count, indexed_keys)))
+    if scanned_keys:
+        group_params = {'_id': None}
+        for key in scanned_keys:
+            # same presence predicate as the $exists counts above; the old
+            # $ifNull truthiness test skipped null, 0 and False values
+            group_params[key] = {'$sum': {
+                '$cond': [
+                    {'$ne': [{'$type': '$' + key}, 'missing']}, 1, 0]
+            }}
+        scan_res = collection_obj.aggregate([
+            {'$group': group_params},
+        ]).next()
+        del scan_res['_id']
+        res.update(scan_res)
+    return {key: res[key] for key in keys_list}
 
 
 def key_value_counts(key, collection_obj, pre_operators=(), verbose=False):
@@ -53,9 +90,9 @@ def key_value_counts(key, collection_obj, pre_operators=(), verbose=False):
         {'$group': {'_id': '$' + key, 'total': {'$sum': 1}}},
         {'$sort': {'total': -1}},
     ])
-    res = {doc['_id']: doc['total'] for doc in cur}
-    return OrderedDict(sorted(
-        res.items(), key=lambda item: item[1], reverse=True))
+    # the cursor is already sorted by descending count, and dicts preserve
+    # insertion order, so no client-side re-sort is needed
+    return {doc['_id']: doc['total'] for doc in cur}
 
 
 def get_distinct_vals_for_key(key, collection_obj, matchop=None):
@@ -63,12 +100,7 @@ def get_distinct_vals_for_key(key, collection_obj, matchop=None):
     matching the given matchop in the given collection."""
     if matchop is None:
         matchop = mongozen.matchop.all_matchop()
-    res = collection_obj.aggregate([
-        {'$match': matchop},
-        {'$project': {'value': '$'+key}},
-        {'$group': {'_id': None, 'distinct_vals': {'$addToSet': '$value'}}}
-    ])
-    return res.next()['distinct_vals']
+    return collection_obj.distinct(key, filter=matchop)
 
 
 def get_distinct_vals_for_nested_key(key, subkey, collection, matchop=None):
@@ -87,17 +119,16 @@ def get_pretty_frequency_table(type_name, frequency_dict, total_count):
     pretty_table_headers = [
         type_name, 'frequency', 'frequency %']
     result_table = PrettyTable(pretty_table_headers)
-    sorted_items = sorted(frequency_dict.items(), key=operator.itemgetter(1))
-    sorted_items.reverse()
-    for item in sorted_items:
-        print(item)
-        total_key_count = item[1]
-        occurrence_percent = round(
-            total_key_count * 100.0 / total_count, 2) if total_count else 0.0
-        prettytable_row = [item[0], total_key_count, occurrence_percent]
-        result_table.add_row(prettytable_row)
-    result_table.add_row(['-----', '--------', '------'])
-    result_table.add_row(['TOTAL', total_count, '//////'])
+    sorted_items = sorted(
+        frequency_dict.items(), key=operator.itemgetter(1), reverse=True)
+    rows = [
+        [key, count,
+         round(count * 100.0 / total_count, 2) if total_count else 0.0]
+        for key, count in sorted_items
+    ]
+    rows.append(['-----', '--------', '------'])
+    rows.append(['TOTAL', total_count, '//////'])
+    result_table.add_rows(rows)
     return result_table
 
 
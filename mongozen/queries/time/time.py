@@ -9,16 +9,15 @@ def groupop_on_date_obj_by_timeframe(timefield_name, timeframe_len_in_sec):
     """Returns a Mongo group operator that group documents on date object time
     field by the timeframe the belong to."""
     timefield = '$' + timefield_name
+    epoch = epoch_datetime()
     return {'$group': {
-        '_id': {
-            '$subtract': [
-                {'$subtract': [timefield, epoch_datetime()]},
-                {'$mod': [
-                    {'$subtract': [timefield, epoch_datetime()]},
-                    1000 * timeframe_len_in_sec
-                ]}
-            ]
-        },
+        '_id': {'$let': {
+            'vars': {'msec': {'$subtract': [timefield, epoch]}},
+            'in': {'$subtract': [
+                '$$msec',
+                {'$mod': ['$$msec', 1000 * timeframe_len_in_sec]}
+            ]}
+        }},
         'count': {'$sum': 1}
     }}
 
@@ -70,7 +69,6 @@ def timeframe_size_dist(
             group_id: The id of the group the distribution belongs to.
             n: The number of timeframes in the distribution.
             Sx_i: The number of entries in the distribution.
-            Sx_i: The sum of squraes of frame sizes in the distribution.
             mean: The mean of the distribution.
             for_all: True if this distribution was computed in a batch
                 where all documents were included, False otherwise.
@@ -95,15 +93,13 @@ def timeframe_size_dist(
             'timefield_type parameter either an int or datetime.datetime!')
 
     first_project_stage = {'$project': {
-        'timeframe': {
-            '$subtract': [
-                timestamp_exp,
-                {'$mod': [
-                    timestamp_exp,
-                    timeframe_len
-                ]}
-            ]
-        }
+        'timeframe': {'$let': {
+            'vars': {'ts': timestamp_exp},
+            'in': {'$subtract': [
+                '$$ts',
+                {'$mod': ['$$ts', timeframe_len]}
+            ]}
+        }}
     }}
 
     first_group_stage = {'$group': {
@@ -113,57 +109,36 @@ def timeframe_size_dist(
     if second_group:
         first_group_stage['$group']['_id']['second_group'] = second_group
 
-    second_project_stage = {'$project': {
-        '_id': 1, 'x_i':1, 'x_i_sqr': {'$multiply': ['$x_i', '$x_i']}
-    }}
-
-    if second_group:
-        second_project_stage['$project'][second_group] = 1
-
     second_group_stage = {'$group': {
         '_id': second_group,
         'mean': {'$avg': '$x_i'},
         'Sx_i': {'$sum': '$x_i'},
-        'Sx_i_sqr': {'$sum': '$x_i_sqr'},
+        'stddev': {'$stdDevSamp': '$x_i'},
         'n': {'$sum': 1}
     }}
 
     third_project_stage = {'$project': {
         '_id': 0,
-        'n': 1, 'Sx_i': 1, 'Sx_i_sqr': 1, 'mean': 1,
+        'n': 1, 'Sx_i': 1, 'mean': 1,
         'for_all': {'$literal': second_group is None},
         'timeframe_length': {'$literal': timeframe_len},
         'collection_name': {'$literal': collection_name},
         'type': {'$literal': 'timeframe_size_dist'},
+        # $stdDevSamp yields null for single-sample groups; report 0 for
+        # them, as the two-pass pipeline this replaced did
         'variance': {'$cond': [
             {'$gte': ['$n', 2]},
-            {'$divide': [
-                {'$subtract': [
-                    '$Sx_i_sqr',
-                    {'$divide':[{'$multiply':['$Sx_i', '$Sx_i']}, '$n']}
-                ]},
-                {'$subtract': ['$n', 1]}
-            ]},
-            0
+            {'$multiply': ['$stddev', '$stddev']},
+            0,
         ]},
     }}
 
-    if second_group:
-        agg_pipline = [
-            {'$match': matchop},
-            first_project_stage,
-            first_group_stage,
-            second_project_stage,
-            second_group_stage,
-            third_project_stage,
-        ]
-    else:
-        agg_pipline = [
-            {'$match': matchop},
-            first_project_stage,
-            first_group_stage,
-            second_project_stage,
-            third_project_stage,
-        ]
+    agg_pipline = [
+        {'$match': matchop},
+        first_project_stage,
+        first_group_stage,
+        second_group_stage,
+        third_project_stage,
+    ]
 
     return collection_obj.aggregate(pipeline=agg_pipline, allowDiskUse=True)
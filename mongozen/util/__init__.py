@@ -1,7 +1,9 @@
 
 from ._util import (  # noqa: F401
     bson_doc_bytesize,
+    bson_doc_bytesizes,
     document_is_not_too_big,
+    any_doc_too_big,
     strictify_query,
     parse_value_for_mongo,
     dateint_to_objectid,
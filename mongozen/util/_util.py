@@ -2,17 +2,19 @@
 
 import subprocess  # for running terminal commands
 import os  # for path handling
-from shutil import rmtree  # for deleting directories
 from ntpath import basename  # for OS-agnostic file-name extraction from path
 import numbers  # to check for number types
 import csv
-from json import JSONDecodeError
-import copy  # for deepcopy-ing dicts
+from datetime import timedelta  # for shifting range bounds
+from itertools import chain, islice  # for batching document cursors
+from functools import lru_cache  # for memoizing repeated conversions
+from math import inf  # sentinel bound for values of unknown bson size
 
 import numpy as np
 import utilitime
 from strct.dicts import flatten_dict
 import bson
+import bson.raw_bson
 from bson.json_util import (
     dumps,
     loads,
@@ -29,6 +31,13 @@ MONGODB_DOC_SIZE_LIMIT_IN_BYTES = \
 
 # ======= utility methods ======
 
+# bound once at import; saves re-resolving the attribute chains in loops that
+# pre-check thousands of documents before bulk inserts
+_BSON_ENCODE = bson.BSON.encode
+_INVALID_DOCUMENT = bson.errors.InvalidDocument
+_ObjectId = bson.objectid.ObjectId
+
+
 def bson_doc_bytesize(document):
     """Returns the size, in bytes, of the given document when encoded as bson.
 
@@ -42,13 +51,69 @@ def bson_doc_bytesize(document):
     int
         The size, in bytes, of the given document when encoded as bson.
     """
-    return len(bson.BSON.encode(document))
+    return len(_BSON_ENCODE(document))
+
+
+# upper bounds, in bytes, on the BSON encoding of exact scalar types; the
+# estimator returns inf for anything not listed so the fast path stays sound
+_BSON_SCALAR_BOUNDS = {
+    bool: 1,
+    float: 8,
+    type(None): 0,
+    _ObjectId: 12,
+}
+
+
+def _rough_doc_bound(document):
+    """Returns a cheap upper bound on the BSON-encoded size of a document.
+
+    The bound never undershoots the true encoded size, so a bound under the
+    16MB limit proves a document fits without paying for a full BSON encode.
+    Values of unknown type, over-wide integers and keys a strict encoder may
+    reject all yield an infinite bound, deferring to the real encoder.
+    """
+    scalar_bounds = _BSON_SCALAR_BOUNDS
+    total = 0
+    stack = [document]
+    while stack:
+        value = stack.pop()
+        vtype = type(value)
+        if vtype is dict:
+            total += 5
+            for key, subvalue in value.items():
+                if type(key) is not str or '\x00' in key:
+                    return inf
+                # element type byte + utf-8 key cstring, at most 4 bytes
+                # per character plus the terminating null
+                total += 2 + 4 * len(key)
+                stack.append(subvalue)
+        elif vtype is str:
+            total += 5 + 4 * len(value)
+        elif vtype is int:
+            if value.bit_length() > 63:
+                return inf  # may overflow int64 and fail to encode
+            total += 8
+        elif vtype in (list, tuple):
+            total += 5 + len(value) * (2 + len(str(len(value))))
+            stack.extend(value)
+        elif vtype is bytes:
+            total += 6 + len(value)
+        else:
+            bound = scalar_bounds.get(vtype)
+            if bound is None:
+                return inf
+            total += bound
+    return total
 
 
 def document_is_not_too_big(document):
     """Returns True if the given documents can be encoded to BSON and the
     result is under the MongoDB size limit of 16MB.
 
+    A cheap over-estimate of the encoded size is computed first; documents
+    proven small by it - the overwhelming majority, in typical bulk-insert
+    workloads - are approved without being encoded at all.
+
     Arguments
     ---------
     document : dict
@@ -60,26 +125,94 @@ def document_is_not_too_big(document):
         True if the given documents can be encoded to BSON and the  result is
         under the MongoDB size limit of 16MB.
     """
+    if _rough_doc_bound(document) < MONGODB_DOC_SIZE_LIMIT_IN_BYTES:
+        return True
     try:
         return bson_doc_bytesize(document) < MONGODB_DOC_SIZE_LIMIT_IN_BYTES
-    except bson.errors.InvalidDocument:
+    except _INVALID_DOCUMENT:
         return False
 
 
+def bson_doc_bytesizes(documents):
+    """Returns the sizes, in bytes, of the given documents encoded as bson.
+
+    Arguments
+    ---------
+    documents : iterable over dict
+        Python dict objects to be encoded as BSON documents.
+
+    Returns
+    -------
+    list of int
+        The size, in bytes, of each given document when encoded as bson.
+    """
+    encode = _BSON_ENCODE
+    return [len(encode(document)) for document in documents]
+
+
+def any_doc_too_big(documents):
+    """Returns True if any of the given documents encodes to BSON over the
+    MongoDB size limit of 16MB, or cannot be encoded at all.
+
+    Arguments
+    ---------
+    documents : iterable over dict
+        Python dict objects to be encoded as BSON documents.
+
+    Returns
+    -------
+    boolean
+        True if any given document fails to encode to BSON under the MongoDB
+        size limit of 16MB.
+    """
+    encode = _BSON_ENCODE
+    try:
+        return any(
+            len(encode(document)) >= MONGODB_DOC_SIZE_LIMIT_IN_BYTES
+            for document in documents
+        )
+    except _INVALID_DOCUMENT:
+        return True
+
+
 def _strictify(some_object):
-    if isinstance(some_object, dict):
-        new_dict = copy.deepcopy(some_object)
-        for key, value in some_object.items():
-            new_dict[key] = _strictify(value)
-        return new_dict
-    if isinstance(some_object, (tuple, list)):
-        new_list = []
-        for item in some_object:
-            new_list.append(_strictify(item))
-        return new_list
-    if isinstance(some_object, bson.objectid.ObjectId):
-        return {"$oid": str(some_object)}
-    return some_object
+    # explicit-stack tree walk; avoids a Python frame per node on deep queries
+    root = [None]
+    stack = [(root, 0, some_object)]
+    while stack:
+        parent, key, value = stack.pop()
+        if isinstance(value, dict):
+            new_dict = {}
+            parent[key] = new_dict
+            # push in reverse so LIFO popping rebuilds the dict in the
+            # original insertion order, which export_collection serializes
+            # into the --query argument
+            for subkey, subvalue in reversed(list(value.items())):
+                stack.append((new_dict, subkey, subvalue))
+        elif isinstance(value, (tuple, list)):
+            new_list = [None] * len(value)
+            parent[key] = new_list
+            for index, item in enumerate(value):
+                stack.append((new_list, index, item))
+        elif isinstance(value, _ObjectId):
+            parent[key] = {"$oid": str(value)}
+        else:
+            parent[key] = value
+    return root[0]
+
+
+def _contains_objectid(some_object):
+    # allocation-free scan, short-circuiting on the first ObjectId found
+    stack = [some_object]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, _ObjectId):
+            return True
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (tuple, list)):
+            stack.extend(value)
+    return False
 
 
 def strictify_query(query_dict):
@@ -96,11 +229,93 @@ def strictify_query(query_dict):
     -------
     dict
         A corresponding query dict with values converted to approriate strict
-        mode JSON representations.
+        mode JSON representations. If the query contains no ObjectId values
+        it is already strict, and the input dict is returned as is.
     """
+    if not _contains_objectid(query_dict):
+        return query_dict
     return _strictify(query_dict)
 
 
+_DOT_TO_HYPHEN = str.maketrans({'.': '-'})
+
+
+def _parse_dict_for_mongo(value):
+    newval = {}
+    for k, v in value.items():
+        key = parse_value_for_mongo(k)
+        if isinstance(key, str):
+            key = key.translate(_DOT_TO_HYPHEN)
+        newval[key] = parse_value_for_mongo(v)
+    return newval
+
+
+def _parse_iterable_for_mongo(value):
+    return [parse_value_for_mongo(element) for element in value]
+
+
+def _parse_number_for_mongo(value):
+    if isinstance(value, numbers.Rational):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, numbers.Complex):
+        return complex(value)
+    return int(value)
+
+
+def _parse_ndarray_for_mongo(value):
+    # tolist() on numeric/bool arrays already yields native Python scalars,
+    # so only object-dtype arrays need per-element recursion
+    if value.dtype.kind == 'O':
+        return _parse_iterable_for_mongo(value.tolist())
+    return value.tolist()
+
+
+def _parse_fallback_for_mongo(value):
+    """Full isinstance ladder for types missing from the dispatch table."""
+    if isinstance(value, np.ndarray):
+        return _parse_ndarray_for_mongo(value)
+    if isinstance(value, dict):
+        return _parse_dict_for_mongo(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return _parse_iterable_for_mongo(value)
+    if isinstance(value, numbers.Number):
+        return _parse_number_for_mongo(value)
+    # generic iterables (e.g. generators) last, so the common cases never
+    # pay for the __iter__ attribute probe
+    if hasattr(value, '__iter__') and not isinstance(value, str):
+        return _parse_iterable_for_mongo(value)
+    return str(value)
+
+
+_MONGO_VALUE_PARSERS = {
+    int: lambda value: value,
+    float: lambda value: value,
+    complex: lambda value: value,
+    bool: int,
+    str: str,
+    dict: _parse_dict_for_mongo,
+    list: _parse_iterable_for_mongo,
+    tuple: _parse_iterable_for_mongo,
+    set: _parse_iterable_for_mongo,
+    frozenset: _parse_iterable_for_mongo,
+    np.ndarray: _parse_ndarray_for_mongo,
+}
+# concrete numpy scalar types dispatch straight to native conversions,
+# skipping the ABC-based numbers checks of the fallback ladder
+_MONGO_VALUE_PARSERS.update({
+    np_type: int for np_type in (
+        np.int8, np.int16, np.int32, np.int64,
+        np.uint8, np.uint16, np.uint32, np.uint64,
+    )
+})
+_MONGO_VALUE_PARSERS.update({
+    np_type: float for np_type in (np.float16, np.float32, np.float64)
+})
+_MONGO_VALUE_PARSERS[np.bool_] = int
+
+
 def parse_value_for_mongo(value):
     """Parse the given value, which might also be a structure like a dict or a
     list, into a format that can be written to mongodb.
@@ -109,33 +324,17 @@ def parse_value_for_mongo(value):
     also replaces dots in key strings with hyphens, as to prevent unintentional
     nesting.
     """
-    newval = 'DefaultValue'
-    if isinstance(value, np.ndarray):
-        newval = value.tolist()
-    elif isinstance(value, dict):
-        newval = {}
-        for k, v in value.items():
-            key = parse_value_for_mongo(k)
-            if isinstance(key, str) and '.' in key:
-                key = key.replace('.', '-')
-            newval[key] = parse_value_for_mongo(v)
-    elif hasattr(value, '__iter__') and not isinstance(value, str):
-        newval = []
-        for element in value:
-            newval.append(parse_value_for_mongo(element))
-    elif isinstance(value, numbers.Number):
-        if isinstance(value, numbers.Rational):
-            newval = int(value)
-        elif isinstance(value, numbers.Real):
-            newval = float(value)
-        elif isinstance(value, numbers.Complex):
-            newval = complex(value)
-        newval = int(value)
-    else:
-        newval = str(value)
-    return newval
+    handler = _MONGO_VALUE_PARSERS.get(type(value))
+    if handler is not None:
+        return handler(value)
+    return _parse_fallback_for_mongo(value)
+
 
+# bound once at import; saves the attribute-chain lookup in range-scan loops
+_OBJECTID_FROM_DATETIME = _ObjectId.from_datetime
 
+
+@lru_cache(maxsize=4096)
 def dateint_to_objectid(dateint):
     """Converts the given dateint into a corresponding dummy MongoDB ObjectId.
 
@@ -150,7 +349,7 @@ def dateint_to_objectid(dateint):
         A dummy MongoDB ObjectId corresponding to the input dateint.
     """
     datetime_obj = utilitime.dateint.dateint_to_datetime(dateint)
-    return bson.objectid.ObjectId.from_datetime(datetime_obj)
+    return _OBJECTID_FROM_DATETIME(datetime_obj)
 
 
 def dateint_range_to_objectid_range(from_dateint, to_dateint):
@@ -171,10 +370,17 @@ def dateint_range_to_objectid_range(from_dateint, to_dateint):
         }} corresponds to querying for obejcts whose insertion time is in the
         range from_dateint <= X <= to_dateint.
     """
-    end_dateint = utilitime.dateint.shift_dateint(to_dateint, 1)
-    return dateint_to_objectid(from_dateint), dateint_to_objectid(end_dateint)
+    # shift the parsed datetime by a day instead of shifting the dateint and
+    # parsing it all over again
+    end_datetime = (
+        utilitime.dateint.dateint_to_datetime(to_dateint) + timedelta(days=1))
+    return (
+        dateint_to_objectid(from_dateint),
+        _OBJECTID_FROM_DATETIME(end_datetime),
+    )
 
 
+@lru_cache(maxsize=4096)
 def timestamp_to_objectid(timestamp):
     """Converts the given dateint into a corresponding dummy MongoDB ObjectId.
 
@@ -189,7 +395,7 @@ def timestamp_to_objectid(timestamp):
         A dummy MongoDB ObjectId corresponding to the input dateint.
     """
     datetime_obj = utilitime.timestamp.timestamp_to_datetime(timestamp)
-    return bson.objectid.ObjectId.from_datetime(datetime_obj)
+    return _OBJECTID_FROM_DATETIME(datetime_obj)
 
 
 def timestamp_range_to_objectid_range(from_timestamp, to_timestgamp):
@@ -218,28 +424,74 @@ def timestamp_range_to_objectid_range(from_timestamp, to_timestgamp):
 # ==== Collection dump and restore
 
 
-def _exec_cmd(cmd):
-    popen = subprocess.Popen(
-        cmd.split(), stdout=subprocess.PIPE, universal_newlines=True)
-    for stdout_line in iter(popen.stdout.readline, ""):
-        print(stdout_line, end="")
-    popen.stdout.close()
-    return_code = popen.wait()
-    if return_code:
-        raise subprocess.CalledProcessError(return_code, cmd)
-
+CMD_MSG = "{msg} for database={db}"
 
-MONGOTEMP_CMD = (
-    '{cmd} --host="{host}" {usr} {pwd} --db="{db}"'
-    ' {authdb} {readpreference} {verbosity}'
-)
 
+def _connection_argv(db_obj, mode, verbose, with_db=True):
+    """Returns the mongo CLI connection arguments for the given database.
 
-CMD_MSG = "{msg} for database={db}"
-
+    Arguments
+    ---------
+    db_obj : pymongo.database.Database
+        The database whose client supplies hosts and credentials.
+    mode : str
+        Either 'reading' or 'writing'; --readPreference is only emitted for
+        reading-mode tools.
+    verbose : bool
+        Determines the verbosity flag appended to the arguments.
+    with_db : bool, optional
+        Whether to include the --db argument. Defaults to True; tools that
+        address namespaces differently (e.g. mongorestore reading an
+        archive) should pass False.
 
-def _mongo_cmd(cmd, msg, db_obj, mode, verbose=None, auto=None):
+    Returns
+    -------
+    list
+        A list of command line argument strings.
     """
+    client = db_obj.client
+    client_options = client._MongoClient__options
+    credentials = client_options.credentials
+    hosts = ['{}:{}'.format(node[0], node[1]) for node in client.nodes]
+    try:
+        repl_set = client_options._ClientOptions__replica_set_name
+    except AttributeError:
+        repl_set = None
+    if repl_set is None:
+        repl_set = ''
+    argv = ['--host', repl_set + '/' + ','.join(hosts)]
+    if getattr(credentials, 'username', None):
+        argv.extend(['--username', credentials.username])
+    if getattr(credentials, 'password', None):
+        argv.extend(['--password', credentials.password])
+    if getattr(credentials, 'source', None):
+        argv.extend(['--authenticationDatabase', credentials.source])
+    if with_db:
+        argv.extend(['--db', db_obj.name])
+    if mode == 'reading':
+        try:
+            pref = client_options._ClientOptions__read_preference
+            argv.extend(['--readPreference', pref.name.lower()])
+        except AttributeError:
+            pass
+    argv.append('-v' if verbose else '--quiet')
+    return argv
+
+
+def _mongo_cmd(cmd_argv, msg, db_obj, mode, verbose=None, auto=None):
+    """Runs the given mongo CLI tool command against the given database.
+
+    Arguments
+    ---------
+    cmd_argv : list
+        The tool-specific argument list, e.g. ['mongodump', '--out', path].
+        Connection arguments are appended from the given database object.
+    msg : str
+        A message describing the command, printed if verbose is set to True.
+    db_obj : pymongo.database.Database
+        The database against which the command is run.
+    mode : str
+        Either 'reading' or 'writing'.
     verbose : bool, default True
         If true, prints information to terminal and requests for confirmation.
     auto : bool, default False
@@ -250,70 +502,31 @@ def _mongo_cmd(cmd, msg, db_obj, mode, verbose=None, auto=None):
         verbose = True
     if auto is None:
         auto = False
-    db_name = db_obj.name
-    client = db_obj.client
-    client_options = client._MongoClient__options
-    credentials = client_options.credentials
     if verbose:
-        print(CMD_MSG.format(msg=msg, db=db_name))
+        print(CMD_MSG.format(msg=msg, db=db_obj.name))
         if not auto:
             response = input("Please confirm by typing 'y': ")
             if response != 'y':
                 return
-    hosts = ['{}:{}'.format(node[0], node[1]) for node in client.nodes]
-    try:
-        repl_set = client_options._ClientOptions__replica_set_name
-    except AttributeError:
-        repl_set = None
-    if repl_set is None:
-        repl_set = ''
-    host_str = repl_set + '/' + ','.join(hosts)
-    try:
-
-        authdb = '--authenticationDatabase="{}"'.format(credentials.source)
-    except AttributeError:
-        authdb = ''
-    try:
-        usr = '--username="{}"'.format(credentials.username)
-    except AttributeError:
-        usr = ''
-    try:
-        pwd = '--password="{}"'.format(credentials.password)
-    except AttributeError:
-        pwd = ''
-    try:
-        pref = client_options._ClientOptions__read_preference
-        readpref = '--readPreference="{}"'.format(pref.name.lower())
-    except AttributeError:
-        readpref = ''
-    verbosity_flag = '--quiet'
-    if verbose:
-        verbosity_flag = '-v'
-    mongo_cmd = MONGOTEMP_CMD.format(
-        cmd=cmd,
-        host=host_str,
-        usr=usr,
-        pwd=pwd,
-        db=db_name,
-        authdb=authdb,
-        readpreference=readpref,
-        verbosity=verbosity_flag
-    )
-    # process = subprocess.Popen(mongo_cmd.split(), stdout=subprocess.PIPE)
+    argv = list(cmd_argv) + _connection_argv(db_obj, mode, verbose)
     try:
-        # _exec_cmd(mongo_cmd)
-        output = subprocess.check_output(
-            mongo_cmd, stderr=subprocess.STDOUT, shell=True,
-            universal_newlines=True)
+        result = subprocess.run(
+            argv,
+            stdout=subprocess.PIPE if verbose else subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True, check=True)
     except subprocess.CalledProcessError as exc:
         print("Status : FAIL", exc.returncode, exc.output)
     else:
         if verbose:
-            print("Output: \n{}\n".format(output))
+            print("Output: \n{}\n".format(result.stdout))
     finally:
         if verbose:
             print('Command was ran.')
-            print('Command:\n{}'.format(mongo_cmd))
+            print('Command:\n{}'.format(' '.join(argv)))
+
+
+ARCHIVE_SUFFIX = '.archive.gz'
 
 
 def dump_collection(source_collection, output_dir_path, query=None,
@@ -326,7 +539,10 @@ def dump_collection(source_collection, output_dir_path, query=None,
     source_collection : pymongo.collection.Collection
         The collection whose contents will be dump.
     output_dir_path : str
-        The full path to the desired output directory.
+        The full path to the desired output directory. If the path ends with
+        '.archive.gz' the dump is instead written to that path as a single
+        gzipped archive file, which is typically several times smaller than
+        the per-collection BSON files written by the directory mode.
     verbose: bool
         Whether to print messages during the operation. Defaults to True.
     auto : bool, default False
@@ -341,16 +557,15 @@ def dump_collection(source_collection, output_dir_path, query=None,
             response = input("Please confirm by typing 'y': ")
             if response != 'y':
                 return
-    partially_formatted_cmd = MONGOTEMP_CMD.format(
-        cmd='mongodump',
-        collection='--collection {}'.format(source_collection.name),
-        dir_flag='--out'
-    )
-    partially_formatted_msg = CMD_MSG.format(
-        action='Dumping', collection=source_collection.name, direction='to')
-    _mongo_cmd(
-        partially_formatted_cmd, partially_formatted_msg,
-        source_collection.database, output_dir_path, 'reading', verbose)
+    cmd_argv = ['mongodump', '--collection', source_collection.name]
+    if output_dir_path.endswith(ARCHIVE_SUFFIX):
+        cmd_argv.extend(['--archive={}'.format(output_dir_path), '--gzip'])
+    else:
+        cmd_argv.extend(['--out', output_dir_path])
+    msg = "Dumping collection {} to {}".format(
+        source_collection.name, output_dir_path)
+    _mongo_cmd(cmd_argv, msg, source_collection.database, 'reading',
+               verbose, auto)
 
 
 def restore_collection(target_db, input_file_path, verbose=True, auto=False):
@@ -362,28 +577,23 @@ def restore_collection(target_db, input_file_path, verbose=True, auto=False):
     collection_name : str
         The namecollection of the collection to restore.
     input_dir_path : str
-        The full path to the desired input directory.
+        The full path to the desired input directory, or to a gzipped archive
+        file (ending with '.archive.gz') written by dump_collection.
     verbose: bool
         Whether to print messages during the operation. Defaults to True.
     auto : bool, default False
         If true, does not ask for confirmation before running the command.
         Otherwise, confirmation is asked if verbose is set to True.
     """
-    partially_formatted_cmd = MONGOTEMP_CMD.format(
-        cmd='mongorestore',
-        collection='',
-        dir_flag='--dir'
-    )
     collection_name = basename(input_file_path)
-    partially_formatted_msg = CMD_MSG.format(
-        action='Resgtoring', collection=collection_name,
-        direction='from')
-    _mongo_cmd(
-        partially_formatted_cmd, partially_formatted_msg, target_db,
-        input_file_path, 'writing', verbose)
-
-
-EXPORT_CMD = "mongoexport {fields} {query} {type}"
+    if input_file_path.endswith(ARCHIVE_SUFFIX):
+        cmd_argv = [
+            'mongorestore', '--archive={}'.format(input_file_path), '--gzip']
+    else:
+        cmd_argv = ['mongorestore', '--dir', input_file_path]
+    msg = "Restoring collection {} from {}".format(
+        collection_name, input_file_path)
+    _mongo_cmd(cmd_argv, msg, target_db, 'writing', verbose, auto)
 
 
 def export_collection(collection, output_fpath, fields=None, query=None,
@@ -406,8 +616,8 @@ def export_collection(collection, output_fpath, fields=None, query=None,
         Specifies the file type to export. Specify 'csv' for CSV format or
         'json' for JSON format. Defaults to 'json'.
     escape_dollar : bool, optional
-        Whether to escape dollar sign in the query string (required in most
-        common shells). Defaults to True.
+        Deprecated and ignored; the command is run without a shell, so dollar
+        signs need no escaping. Retained for backward compatibility.
     verbose: bool, optional
         Whether to print messages during the operation. Defaults to True.
     auto : bool, default False
@@ -416,33 +626,28 @@ def export_collection(collection, output_fpath, fields=None, query=None,
     """
     if ftype is None:
         ftype = 'csv'
-    if escape_dollar is None:
-        escape_dollar = True
     if '~' in output_fpath:
         output_fpath = os.path.expanduser(output_fpath)
-    cmd = 'mongoexport --collection="{}" --out="{}"'.format(
-        collection.name, output_fpath)
+    cmd_argv = [
+        'mongoexport',
+        '--collection', collection.name,
+        '--out', output_fpath,
+    ]
     msg = "Exporting collection {} to {}".format(collection.name, output_fpath)
     if fields:
-        cmd += ' --fields="{}"'.format(','.join(fields))
+        cmd_argv.extend(['--fields', ','.join(fields)])
         msg += ", limiting to fields {}".format(fields)
     if query:
         msg += ", with query {},".format(query)
         query = strictify_query(query)
         query = "{}".format(query)
         query = query.replace(" ", "")
-        if escape_dollar:
-            query = query.replace("$", "\$")
-            assert isinstance(query, str)
-        cmd += ' --query="{}"'.format(query)
+        cmd_argv.extend(['--query', query])
     if ftype:
-        cmd += ' --type="{}"'.format(ftype)
+        cmd_argv.extend(['--type', ftype])
         msg += " with {} file type,".format(ftype)
-    _mongo_cmd(cmd=cmd, msg=msg, db_obj=collection.database, mode='reading',
-               verbose=verbose, auto=auto)
-
-
-DUMPS_DIR_PATH = os.path.expanduser('~/.mongozen_temp_dump')
+    _mongo_cmd(cmd_argv=cmd_argv, msg=msg, db_obj=collection.database,
+               mode='reading', verbose=verbose, auto=auto)
 
 
 def copy_collection(source_collection, target_db, temp_dir_path=None,
@@ -450,57 +655,70 @@ def copy_collection(source_collection, target_db, temp_dir_path=None,
     """Copies the contents of the given source collection to that of the
     target one.
 
+    The copy is streamed directly from a mongodump gzipped-archive pipe into
+    mongorestore, so collection contents never touch the local drive.
+
     Arguments
     ---------
     source_collection : pymongo.collection.Collection
         The collection whose contents will be copied.
-    target_collection : pymongo.collection.Collection
-        The collection to which all contents of the source collection will be
+    target_db : pymongo.database.Database
+        The database to which the contents of the source collection will be
         copied.
     temp_dir_path: str, optional
-        A path to the directory to use for temporary storage of collection
-        contents while copying.
+        Deprecated and ignored; no temporary storage is used any more.
+        Retained for backward compatibility.
     verbose: bool, optional
         Whether to print messages during the operation. Defaults to True.
     """
     if verbose:
-        print("Copying collection {}.{}.{}.{} to {}.{}.{}".format(
-            source_collection.database.client.env,
-            source_collection.database.client.server,
+        print("Copying collection {}.{} to {}.{}".format(
             source_collection.database.name,
             source_collection.name,
-            target_db.client.env,
-            target_db.client.server,
-            target_db.name))
-    temp_dir_name = "{}/{}".format(
-        source_collection.database.client.env,
-        source_collection.database.client.server
-    )
-    if temp_dir_path is None:
-        dumps_dir_path = DUMPS_DIR_PATH
-    temp_dump_dir_path = os.path.join(dumps_dir_path, temp_dir_name)
-    os.mkdirs(temp_dump_dir_path, exist_ok=True)
-    dump_collection(source_collection, temp_dump_dir_path, verbose)
-    if verbose:
-        print("Done dumping the source collection. Now copying to target...")
-    temp_dump_subdir_path = os.path.join(
-        temp_dump_dir_path, source_collection.database.name)
-    temp_dump_file_path = os.path.join(
-        temp_dump_subdir_path, source_collection.name+'.bson')
-    restore_collection(target_db, temp_dump_file_path, verbose)
-    if verbose:
-        print("Done copying. Deleting dump from drive...")
-    rmtree(temp_dump_dir_path)
+            target_db.name,
+            source_collection.name))
+    dump_argv = [
+        'mongodump',
+        '--collection', source_collection.name,
+        '--archive', '--gzip',
+    ] + _connection_argv(source_collection.database, 'reading', verbose)
+    # with --archive input, --db acts as a namespace filter against the
+    # archive's source namespaces rather than a rename target, so the
+    # database remap must be spelled out with --nsFrom/--nsTo
+    source_ns = '{}.{}'.format(
+        source_collection.database.name, source_collection.name)
+    target_ns = '{}.{}'.format(target_db.name, source_collection.name)
+    restore_argv = [
+        'mongorestore', '--archive', '--gzip',
+        '--nsFrom', source_ns, '--nsTo', target_ns,
+    ] + _connection_argv(target_db, 'writing', verbose, with_db=False)
+    dump_proc = subprocess.Popen(dump_argv, stdout=subprocess.PIPE)
+    restore_proc = subprocess.Popen(restore_argv, stdin=dump_proc.stdout)
+    # close our handle so mongodump gets SIGPIPE if mongorestore dies
+    dump_proc.stdout.close()
+    restore_code = restore_proc.wait()
+    dump_code = dump_proc.wait()
+    if dump_code:
+        raise subprocess.CalledProcessError(dump_code, dump_argv)
+    if restore_code:
+        raise subprocess.CalledProcessError(restore_code, restore_argv)
     if verbose:
         print("Collection copy operation done.")
 
 
+CSV_DUMP_BATCH_SIZE = 10000
+
+
 def dump_document_cursor_to_csv(doc_cursor, file_path, fieldnames=None,
                                 missing_val=None, flatten=False):
     """Writes documents in a pymongo cursor into a csv file.
 
     Documents are dumped in the order they are returned from the cursor.
 
+    If pandas is installed, documents are written in batches of
+    CSV_DUMP_BATCH_SIZE rows through DataFrame.to_csv, moving per-cell
+    formatting into C code; otherwise the stdlib csv writer is used.
+
     Arguments
     ---------
     doc_cursor : pymongo.cursor.Cursor
@@ -529,20 +747,64 @@ def dump_document_cursor_to_csv(doc_cursor, file_path, fieldnames=None,
     if fieldnames is None:
         first_doc = doc_cursor.next()
         fieldnames = sorted(list(doc_trans(first_doc).keys()))
-    with open(file_path, 'w+') as file_obj:
-        writer = csv.DictWriter(file_obj, fieldnames, restval=missing_val,
-                                extrasaction='ignore', dialect='excel')
-        writer.writeheader()
-        if first_doc:
-            writer.writerow(doc_trans(first_doc))
-            print(doc_trans(first_doc))
-        for document in doc_cursor:
-            writer.writerow(doc_trans(document))
+    if first_doc is not None:
+        documents = chain([first_doc], doc_cursor)
+    else:
+        documents = iter(doc_cursor)
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        with open(file_path, 'w+', newline='') as file_obj:
+            first_batch = True
+            while True:
+                batch = list(islice(documents, CSV_DUMP_BATCH_SIZE))
+                if not batch and not first_batch:
+                    break
+                # pre-projected object-dtype rows keep pandas from inferring
+                # numeric dtypes per batch, so output cells are formatted
+                # exactly like the stdlib csv path formats them
+                rows = [
+                    [doc.get(field, missing_val) for field in fieldnames]
+                    for doc in map(doc_trans, batch)
+                ]
+                frame = pd.DataFrame(rows, columns=fieldnames, dtype=object)
+                # the csv module's excel dialect terminates rows with \r\n
+                frame.to_csv(file_obj, index=False, header=first_batch,
+                             lineterminator='\r\n')
+                if not batch:
+                    break
+                first_batch = False
+        return
+    with open(file_path, 'w+', newline='') as file_obj:
+        writer = csv.writer(file_obj, dialect='excel')
+        writer.writerow(fieldnames)
+        # pre-projecting rows against fieldnames lets writerows drive the
+        # whole loop at C speed, instead of a DictWriter field lookup and
+        # writerow call per document
+        writer.writerows(
+            [doc.get(field, missing_val) for field in fieldnames]
+            for doc in map(doc_trans, documents)
+        )
+
+
+JSON_DUMP_BATCH_SIZE = 512
 
 
 def dump_document_cursor_to_json(doc_cursor, file_path):
     """Writes documents in a pymongo cursor into a json file.
 
+    Documents are encoded with bson.json_util.dumps, preserving MongoDB
+    extended JSON types, and written in batches of JSON_DUMP_BATCH_SIZE
+    documents to avoid issuing two tiny writes per document.
+
+    If the cursor yields RawBSONDocument objects (e.g. a find over a
+    collection configured with raw_bson codec options) and the optional
+    python-bsonjs package is installed, documents are converted straight
+    from their wire-format bytes with bsonjs.dumps, skipping the
+    BSON-to-dict-to-JSON round-trip.
+
     Arguments
     ---------
     doc_cursor : pymongo.cursor.Cursor
@@ -550,12 +812,38 @@ def dump_document_cursor_to_json(doc_cursor, file_path):
     file_path : str
         The full path of the file into which cursor documents are dumped.
     """
+    documents = iter(doc_cursor)
+    try:
+        first_doc = next(documents)
+    except StopIteration:
+        with open(file_path, 'w+') as dump_json:
+            dump_json.write('[\n]')
+        return
+    documents = chain([first_doc], documents)
+    encode = dumps
+    if isinstance(first_doc, bson.raw_bson.RawBSONDocument):
+        try:
+            import bsonjs
+            def encode(doc):  # noqa: E306, F811
+                return bsonjs.dumps(doc.raw)
+        except ImportError:
+            pass
     with open(file_path, 'w+') as dump_json:
         dump_json.write('[\n')
-        dump_json.write(dumps(doc_cursor.next()))
-        for doc in doc_cursor:
-            dump_json.write(',\n')
-            dump_json.write(dumps(doc))
+        first_batch = True
+        batch = []
+        for doc in documents:
+            batch.append(encode(doc))
+            if len(batch) == JSON_DUMP_BATCH_SIZE:
+                if not first_batch:
+                    dump_json.write(',\n')
+                dump_json.write(',\n'.join(batch))
+                first_batch = False
+                batch = []
+        if batch:
+            if not first_batch:
+                dump_json.write(',\n')
+            dump_json.write(',\n'.join(batch))
         dump_json.write('\n]')
 
 
@@ -568,12 +856,8 @@ def load_document_iterator_from_json(file_path):
         The full path of the file from which documents are read.
     """
     with open(file_path, 'r') as load_json:
-        line = load_json.readline()
-        while line:
-            if line not in ('[\n', ']'):  # ignore start and end of array
-                try:  # skip trailing , and one \n
-                    yield loads(line[:-2])
-                except JSONDecodeError:  # last line has no , so just \n
-                    yield loads(line[:-1])
-            line = load_json.readline()
-        raise StopIteration
+        for line in load_json:
+            if line in ('[\n', ']'):  # ignore start and end of array
+                continue
+            # strip the trailing newline, and the comma on all lines but last
+            yield loads(line.rstrip('\n,'))
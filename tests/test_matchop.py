@@ -55,3 +55,10 @@ class TestMatchopAnd(TestCase):
         res = Matchop({'a': {'$eq': 9}}) & {'a': {'$lte': 8}}
         expected = {'a': {'$eq': 9, '$lte': 8}}
         self.assertEqual(res, expected)
+
+    def test_matchop_and_8(self):
+        """Tests Matchop and operator."""
+        print("Test 8")
+        res = Matchop({'a': {'$eq': 7}}) & {'a': {'$gt': 5}}
+        expected = {'a': {'$eq': 7}}
+        self.assertEqual(res, expected)